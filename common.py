@@ -0,0 +1,131 @@
+"""Helpers shared by dash_plotter.py, eda_dashboard.py and simple_plotter.py.
+
+Column type inference and probes, server-side histograms and discrete colorscales. The
+server-side cache and upload parsing used by the Dash apps live in datastore.py.
+
+Dependencies: pandas, plotly
+"""
+
+from __future__ import annotations
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objs as go
+
+
+# Upper bound on server-side histogram bins
+MAX_HIST_BINS = 100
+
+
+def exceeds_cardinality(values: np.ndarray, limit: int) -> bool:
+    """Return True once `values` holds more than `limit` distinct non-missing values.
+
+    Values are scanned in geometrically growing chunks, so high-cardinality
+    columns exit after a few dozen rows instead of hashing the whole column.
+    """
+    seen = values[:0]
+    start, step = 0, max(limit + 1, 64)
+    while start < len(values):
+        chunk = values[start:start + step]
+        # pd.isna also covers object arrays (e.g. stringified category columns)
+        chunk = chunk[~pd.isna(chunk)]
+        seen = np.unique(np.concatenate([seen, chunk]))
+        if len(seen) > limit:
+            return True
+        start += step
+        step *= 2
+    return False
+
+
+def infer_column_types(df: pd.DataFrame, cat_threshold: int = 20) -> Tuple[List[str], List[str]]:
+    """Return numeric and categorical column lists.
+
+    Numeric = pandas numeric dtypes and timedeltas.
+    Categorical = object/string/category/bool/datetime OR numeric columns with low cardinality.
+    """
+    # single pass over the dtypes; string dtypes are matched explicitly, not through "object"
+    numeric, categorical = [], []
+    for col, dtype in df.dtypes.items():
+        # timestamps (parsed by the Arrow CSV reader) serve as categorical x values
+        if (pd.api.types.is_bool_dtype(dtype) or isinstance(dtype, pd.CategoricalDtype)
+                or pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype)
+                or pd.api.types.is_datetime64_any_dtype(dtype)):
+            categorical.append(col)
+        elif pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_timedelta64_dtype(dtype):
+            numeric.append(col)
+
+    # Consider numeric columns with low unique counts as categorical (e.g., small enums).
+    # The head already tells us about most high-cardinality columns; the rest
+    # are probed until they pass cat_threshold rather than counted in full.
+    head = df[numeric].head(cat_threshold + 1).nunique(dropna=True)
+    candidates = head.index[head <= cat_threshold].tolist()
+    # the two lists above are disjoint, so no column is added twice
+    categorical += [c for c in candidates if not exceeds_cardinality(probe_values(df[c]), cat_threshold)]
+    return numeric, categorical
+
+
+def probe_values(s: pd.Series) -> np.ndarray:
+    """Values of a numeric column as a NaN-padded float (or complex) array.
+
+    Timedeltas are measured in seconds.
+    """
+    # dispatch on dtype up front so the probe never has to catch conversion errors
+    if pd.api.types.is_timedelta64_dtype(s.dtype):
+        # a plain float cast would turn NaT into the int64 minimum (-9.2e18)
+        s = s.dt.total_seconds()
+    dtype = "complex128" if pd.api.types.is_complex_dtype(s.dtype) else "float64"
+    return s.to_numpy(dtype=dtype, na_value=np.nan)
+
+
+def color_groups(df: pd.DataFrame, color: Optional[str]):
+    """Yield (trace name, rows) per value of `color`, or the whole frame when unset."""
+    if not color:
+        yield "", df
+        return
+    for name, g in df.groupby(color, sort=False, dropna=False, observed=True):
+        yield str(name), g
+
+
+def histogram_traces(df: pd.DataFrame, x: str, color: Optional[str] = None,
+                     bins="auto", max_bins: int = MAX_HIST_BINS) -> List[go.Bar]:
+    """Bar traces of per-group bin counts, binned server side.
+
+    Only the counts go to the browser instead of every raw value. Numeric
+    columns (and timedeltas, in seconds) share one set of bin edges (`bins` as
+    for `np.histogram`, at most `max_bins`) across groups; other columns are
+    counted per value.
+    """
+    binned = pd.api.types.is_numeric_dtype(df[x]) or pd.api.types.is_timedelta64_dtype(df[x])
+    if not binned or pd.api.types.is_bool_dtype(df[x]):
+        traces = []
+        for name, g in color_groups(df, color):
+            counts = g[x].value_counts(sort=False)
+            traces.append(go.Bar(x=counts.index.astype(str).to_numpy(), y=counts.to_numpy(), name=name))
+        return traces
+
+    values = probe_values(df[x]).real
+    finite = values[np.isfinite(values)]
+    if len(finite) == 0:
+        return []
+    edges = np.histogram_bin_edges(finite, bins=bins)
+    if len(edges) > max_bins + 1:
+        edges = np.histogram_bin_edges(finite, bins=max_bins)
+    centers, widths = (edges[:-1] + edges[1:]) / 2, np.diff(edges)
+
+    traces = []
+    for name, g in color_groups(df, color):
+        counts, _ = np.histogram(probe_values(g[x]).real, bins=edges)
+        traces.append(go.Bar(x=centers, y=counts, width=widths, name=name))
+    return traces
+
+
+def discrete_colorscale(n: int, palette: List[str] = px.colors.qualitative.Plotly) -> list:
+    """Stepwise colorscale giving integer codes 0..n-1 one flat palette color each."""
+    scale = []
+    for i in range(n):
+        c = palette[i % len(palette)]
+        scale += [[i / n, c], [(i + 1) / n, c]]
+    return scale
@@ -12,9 +12,10 @@ Features:
 - Select plot type (scatter, box, bar, histogram, violin)
 - Dropdowns for x, y, color, size that update to show only relevant columns
 - Responsive interactive Plotly figures
+- WebGL rendering for large scatter plots (Renderer dropdown: auto/webgl/svg)
 
-Dependencies: dash, pandas, plotly
-Install: pip install dash pandas plotly
+Dependencies: dash[diskcache], pandas, plotly, pyarrow, flask-caching, orjson
+Install: pip install "dash[diskcache]" pandas plotly pyarrow flask-caching orjson
 
 Run: python dash_plotter.py
 Then open http://127.0.0.1:8050 in your browser.
@@ -22,59 +23,239 @@ Then open http://127.0.0.1:8050 in your browser.
 
 from __future__ import annotations
 
-import base64
-import io
-from typing import List, Optional
+import os
+import tempfile
+from functools import lru_cache
+from typing import Optional
 
+import diskcache
+import numpy as np
 import pandas as pd
 import plotly.express as px
-from dash import Dash, dcc, html, Input, Output, State
+import plotly.graph_objs as go
+import plotly.io as pio
+from dash import Dash, DiskcacheManager, Patch, ctx, dcc, html, no_update, set_props, Input, Output, State
+from dash.exceptions import PreventUpdate
 
+from common import color_groups, discrete_colorscale, histogram_traces, infer_column_types, probe_values
+from datastore import DatasetExpired, cache, cache_config, content_key, load_df, read_upload, store_df
 
-def safe_read_json(json_string: str) -> pd.DataFrame:
-    """Safely read JSON from string using StringIO to avoid FutureWarning."""
-    return pd.read_json(io.StringIO(json_string), orient="split")
 
+# Above this many rows the "auto" renderer switches scatter traces to WebGL
+WEBGL_THRESHOLD = 1000
 
-def infer_column_types(df: pd.DataFrame, cat_threshold: int = 20):
-    """Return numeric and categorical column lists.
+# Row cap for point-based plots (scatter/box/violin) shipped to the browser
+MAX_PLOT_POINTS = 50_000
 
-    Numeric = pandas numeric dtypes.
-    Categorical = object/category/bool OR numeric columns with low cardinality.
+# Box/violin plots draw every point up to this many rows, only outliers above it
+ALL_POINTS_THRESHOLD = 5000
+
+# Non-numeric scatter colors with more distinct values than this are drawn in one flat color
+MAX_COLOR_CATEGORIES = 20
+
+# Server-side DataFrame cache (see datastore.py); `df-store` only holds the content key
+CACHE_CONFIG = cache_config("dash_plotter_cache")
+# Shown when the active dataset has been evicted from the server-side cache
+EXPIRED_MESSAGE = "This dataset is no longer cached on the server; please upload it again"
+# Job store for background callbacks (figure building runs in worker processes)
+BACKGROUND_CACHE_DIR = os.path.join(tempfile.gettempdir(), "dash_plotter_jobs")
+
+
+@lru_cache(maxsize=8)
+def column_types(key: str):
+    """Memoized `infer_column_types` for the cached DataFrame `key`."""
+    return infer_column_types(load_df(key))
+
+
+def df_schema(key: str) -> dict:
+    """Column split of the cached DataFrame `key`, small enough for a `dcc.Store`."""
+    numeric, categorical = column_types(key)
+    return {"numeric": numeric, "categorical": categorical, "columns": list(load_df(key).columns)}
+
+
+def resolve_render_mode(renderer: Optional[str], n_rows: int) -> str:
+    """Map the Renderer dropdown value to a Plotly `render_mode`.
+
+    "auto" uses WebGL for frames larger than WEBGL_THRESHOLD rows and SVG otherwise.
+    "svg" stays available for browsers where WebGL is disabled.
     """
-    numeric = df.select_dtypes(include=["number"]).columns.tolist()
-    categorical = df.select_dtypes(include=["object", "category", "bool"]).columns.tolist()
+    if renderer in ("svg", "webgl"):
+        return renderer
+    return "webgl" if n_rows > WEBGL_THRESHOLD else "svg"
+
+
+def sample_rows(df: pd.DataFrame, n: int = MAX_PLOT_POINTS, stratify: Optional[str] = None) -> pd.DataFrame:
+    """Return at most `n` rows of `df` (deterministic).
+
+    When `stratify` names a categorical column, every group keeps its share of rows.
+    """
+    if len(df) <= n:
+        return df
+    if stratify:
+        # group on factorized codes: GroupBy.sample raises KeyError on NaN group keys
+        codes, _ = pd.factorize(df[stratify], use_na_sentinel=False)
+        return df.groupby(codes, group_keys=False, sort=False).sample(frac=n / len(df), random_state=0)
+    return df.sample(n, random_state=0)
 
-    # Consider numeric columns with low unique counts as categorical (e.g., small enums)
-    for col in numeric:
-        try:
-            if df[col].nunique(dropna=True) <= cat_threshold:
-                categorical.append(col)
-        except Exception:
-            pass
 
-    # Dedupe
-    categorical = [c for i, c in enumerate(categorical) if c not in categorical[:i]]
-    return numeric, categorical
+def message_figure(text: str) -> go.Figure:
+    """Empty figure that only shows `text` as its title."""
+    return go.Figure(layout={"title": {"text": text}})
 
 
-def parse_upload(contents: str, filename: str) -> pd.DataFrame:
-    header, encoded = contents.split(",", 1)
-    data = base64.b64decode(encoded)
-    # try common formats
+def scatter_marker(df: pd.DataFrame, color: Optional[str], size: Optional[str]) -> dict:
+    """Marker dict styling a single scatter trace by `color` and `size` columns.
+
+    Numeric colors use a continuous scale; anything else is factorized to integer
+    codes on a discrete scale (missing values get a code of their own), up to
+    MAX_COLOR_CATEGORIES values. Sizes are rescaled to 5-25px.
+    """
+    marker = {"size": 8}
+    if color:
+        s = df[color]
+        if pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s):
+            marker.update(color=s.to_numpy(), colorscale="Viridis", showscale=True,
+                          colorbar={"title": {"text": color}})
+        else:
+            codes, uniques = pd.factorize(s, use_na_sentinel=False)
+            n = max(len(uniques), 1)
+            # past the cap a tick per value is unreadable: keep the flat default color
+            # (values still show on hover)
+            if n <= MAX_COLOR_CATEGORIES:
+                marker.update(color=codes, colorscale=discrete_colorscale(n), cmin=-0.5, cmax=n - 0.5,
+                              showscale=True, colorbar={"title": {"text": color}, "tickvals": list(range(n)),
+                                                        "ticktext": [str(u) for u in uniques]})
+    if size:
+        arr = probe_values(df[size]).real
+        lo, hi = np.nanmin(arr), np.nanmax(arr)
+        if np.isfinite(hi - lo) and hi > lo:
+            marker["size"] = np.nan_to_num(5 + (arr - lo) / (hi - lo) * 20, nan=5.0)
+    return marker
+
+
+def compact_strings(df: pd.DataFrame, max_ratio: float = 0.5) -> pd.DataFrame:
+    """Convert repeated-string columns to `category` (stored as Arrow dictionaries)."""
+    for col, dtype in df.dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype):
+            continue
+        if pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype):
+            if df[col].nunique() < max_ratio * len(df):
+                df[col] = df[col].astype("category")
+    return df
+
+
+def scatter_hover(df: pd.DataFrame, x: str, y: str, color: Optional[str], size: Optional[str]) -> dict:
+    """`customdata` + `hovertemplate` showing only the x/y/color/size columns."""
+    extra = list(dict.fromkeys(c for c in (color, size) if c and c not in (x, y)))
+    template = f"{x}: %{{x}}<br>{y}: %{{y}}"
+    template += "".join(f"<br>{c}: %{{customdata[{i}]}}" for i, c in enumerate(extra))
+    customdata = np.column_stack([df[c].to_numpy() for c in extra]) if extra else None
+    return {"customdata": customdata, "hovertemplate": template + "<extra></extra>"}
+
+
+def build_figure(df_key: str, plot_type: str, x: Optional[str], y: Optional[str],
+                 color: Optional[str], size: Optional[str], renderer: Optional[str]):
+    """Build the main figure for the current control values."""
     try:
-        return pd.read_csv(io.BytesIO(data))
-    except Exception:
-        try:
-            return pd.read_excel(io.BytesIO(data))
-        except Exception as e:
-            raise ValueError(f"Unable to parse uploaded file '{filename}': {e}")
+        df = load_df(df_key)
+    except DatasetExpired:
+        return message_figure(EXPIRED_MESSAGE)
+
+    # Basic guard
+    if df is None or df.shape[0] == 0:
+        return {}
+
+    # only scatter has a WebGL trace type (scattergl); the other plot types stay SVG
+    render_mode = resolve_render_mode(renderer, len(df))
+
+    # point-based plots get a capped sample; bar/hist aggregate anyway. Box/violin
+    # stratify by color; scatter must not, so its points survive a color change
+    _, categorical = column_types(df_key)
+    stratify = color if color in categorical and plot_type in ("box", "violin") else None
+
+    try:
+        plot_df = sample_rows(df, stratify=stratify)
+        # past the threshold, per-point markers (and their hover targets) dominate the DOM
+        box_points = "all" if len(plot_df) <= ALL_POINTS_THRESHOLD else "outliers"
+
+        if plot_type in ("box", "violin", "bar") and (not x or not y):
+            return message_figure("Select X (categorical) and Y (numeric)")
+        if plot_type == "hist" and not x:
+            return message_figure("Select X column")
+        if plot_type not in ("box", "violin", "bar", "hist") and (not x or not y):
+            return message_figure("Select X and Y columns")
+
+        # one legend entry per color group; scatter (and continuous bar) colors use a colorbar
+        legend = bool(color) and plot_type != "scatter"
+        if plot_type == "box":
+            fig = go.Figure([
+                go.Box(x=g[x].to_numpy(), y=g[y].to_numpy(), name=name, boxpoints=box_points,
+                       hoveron="boxes" if box_points == "outliers" else "boxes+points")
+                for name, g in color_groups(plot_df, color)
+            ])
+            fig.update_layout(boxmode="group")
+        elif plot_type == "violin":
+            fig = go.Figure([
+                go.Violin(x=g[x].to_numpy(), y=g[y].to_numpy(), name=name, points=box_points,
+                          hoveron="violins" if box_points == "outliers" else "violins+points")
+                for name, g in color_groups(plot_df, color)
+            ])
+            fig.update_layout(violinmode="group")
+        elif plot_type == "bar" and color and color not in categorical and pd.api.types.is_numeric_dtype(df[color]):
+            # continuous color: a single trace, each x bar shaded by the mean of the color column
+            grouped = df.groupby(x, sort=True, observed=True)
+            sums, shade = grouped[y].sum(), grouped[color].mean()
+            fig = go.Figure(go.Bar(x=sums.index.to_numpy(), y=sums.to_numpy(),
+                                   marker={"color": shade.to_numpy(), "colorscale": "Viridis", "showscale": True,
+                                           "colorbar": {"title": {"text": f"mean {color}"}}}))
+            legend = False
+        elif plot_type == "bar":
+            # one bar per x (and color) group holding the sum of y
+            fig = go.Figure()
+            for name, g in color_groups(df, color):
+                sums = g.groupby(x, sort=True, observed=True)[y].sum()
+                fig.add_trace(go.Bar(x=sums.index.to_numpy(), y=sums.to_numpy(), name=name))
+            fig.update_layout(barmode="relative")
+        elif plot_type == "hist":
+            fig = go.Figure(histogram_traces(df, x, color))
+            fig.update_layout(barmode="relative", bargap=0)
+        else:
+            # single trace styled through its marker so color/size can be patched
+            trace_type = go.Scattergl if render_mode == "webgl" else go.Scatter
+            fig = go.Figure(trace_type(x=plot_df[x].to_numpy(), y=plot_df[y].to_numpy(), mode="markers",
+                                       marker=scatter_marker(plot_df, color, size),
+                                       **scatter_hover(plot_df, x, y, color, size)))
+            # keep zoom/pan while only color or size change
+            fig.update_layout(uirevision=f"{x}|{y}")
+
+        fig.update_layout(xaxis_title=x, yaxis_title=y if plot_type != "hist" else "count",
+                          legend_title_text=color, showlegend=legend)
+        if len(plot_df) < len(df) and plot_type in ("scatter", "box", "violin"):
+            fig.update_layout(title=f"Showing a sample of {len(plot_df):,} of {len(df):,} rows")
+        fig.update_layout(transition_duration=200)
+        return fig
+    except Exception as e:
+        # return a simple figure with error message
+        return message_figure(f"Error building plot: {e}")
 
 
 def create_app() -> Dash:
-    app = Dash(__name__)
+    def on_callback_error(err):
+        # callbacks reading an evicted dataset keep their outputs and say why
+        if isinstance(err, DatasetExpired):
+            set_props("upload-filename", {"children": EXPIRED_MESSAGE})
+            return None
+        raise err
+
+    background_manager = DiskcacheManager(diskcache.Cache(BACKGROUND_CACHE_DIR))
+    app = Dash(__name__, background_callback_manager=background_manager, on_error=on_callback_error)
+    cache.init_app(app.server, config=CACHE_CONFIG)
+    # Dash encodes callback responses through plotly's JSON layer; use orjson there
+    pio.json.config.default_engine = "orjson"
 
     demo_df = px.data.tips()
+    # pinned in memory: every fresh page load starts from this key
+    demo_key = store_df(demo_df, pin=True)
 
     # Layout: main plot on the left, controls on the right stacked vertically
     app.layout = html.Div([
@@ -83,7 +264,12 @@ def create_app() -> Dash:
         html.Div([
             # Left: graph
             html.Div([
-                dcc.Store(id="df-store", data=demo_df.to_json(date_format="iso", orient="split")),
+                dcc.Store(id="df-store", data=demo_key),
+                dcc.Store(id="schema-store", data=df_schema(demo_key)),
+                # color/size the current figure was built with (see update_style)
+                dcc.Store(id="rendered-style"),
+                # color/size change on a grouped plot, rebuilt by update_figure
+                dcc.Store(id="style-request"),
                 dcc.Loading(dcc.Graph(id="main-graph", style={"height": "80vh"}, config={"displaylogo": False, "modeBarButtonsToRemove": ["lasso2d", "select2d"]}), type="default"),
             ], style={"flex": "1"}),
 
@@ -121,6 +307,18 @@ def create_app() -> Dash:
                     clearable=False,
                 ),
 
+                html.Label("Renderer"),
+                dcc.Dropdown(
+                    id="renderer",
+                    options=[
+                        {"label": "Auto", "value": "auto"},
+                        {"label": "WebGL", "value": "webgl"},
+                        {"label": "SVG", "value": "svg"},
+                    ],
+                    value="auto",
+                    clearable=False,
+                ),
+
                 html.Hr(),
 
                 html.Div([html.Label("X"), dcc.Dropdown(id="x-column")], id="x-container", style={"marginBottom": 8}),
@@ -137,143 +335,174 @@ def create_app() -> Dash:
 
     @app.callback(
         Output("df-store", "data"),
+        Output("schema-store", "data"),
         Output("upload-filename", "children"),
         Input("upload-data", "contents"),
         State("upload-data", "filename"),
         State("df-store", "data"),
+        State("schema-store", "data"),
     )
-    def handle_upload(contents, filename, current_json):
+    def handle_upload(contents, filename, current_key, current_schema):
         # If no upload, keep current data
         if contents is None:
-            return current_json, "Using example dataset"
+            return current_key, current_schema, "Using example dataset"
+        key = content_key(contents.encode())
+        # re-uploading a file that is still cached skips parsing altogether
+        if cache.has(key):
+            return key, df_schema(key), f"Loaded: {filename} ({len(load_df(key))} rows)"
         try:
-            df = parse_upload(contents, filename)
+            df = compact_strings(read_upload(contents, filename))
+            # keep the parsed frame server side; the browser only gets its key and schema
+            key = store_df(df, key)
         except Exception as e:
-            return current_json, f"Upload failed: {e}"
-        # store as json
-        return df.to_json(date_format="iso", orient="split"), f"Loaded: {filename} ({len(df)} rows)"
+            return current_key, current_schema, f"Upload failed: {e}"
+        return key, df_schema(key), f"Loaded: {filename} ({len(df)} rows)"
+
+
+    @app.callback(
+        Output("color-column", "options"),
+        Output("color-column", "value"),
+        Input("schema-store", "data"),
+        State("color-column", "value"),
+    )
+    def update_color_options(schema, current_color):
+        # color accepts any column regardless of plot type, so only a new dataset changes it.
+        # An unchanged (empty) value is not re-sent, which would trigger update_style
+        return [{"label": c, "value": c} for c in schema["columns"]], None if current_color else no_update
 
 
     @app.callback(
         Output("x-column", "options"),
         Output("y-column", "options"),
-        Output("color-column", "options"),
         Output("size-column", "options"),
         Output("x-column", "value"),
         Output("y-column", "value"),
-        Output("color-column", "value"),
         Output("size-column", "value"),
-        Input("df-store", "data"),
+        Input("schema-store", "data"),
         Input("plot-type", "value"),
+        State("x-column", "options"),
+        State("y-column", "options"),
+        State("size-column", "options"),
+        State("size-column", "value"),
     )
-    def update_column_options(df_json, plot_type):
-        df = safe_read_json(df_json)
-        numeric, categorical = infer_column_types(df)
-
-        # default options (all columns)
-        all_options = [{"label": c, "value": c} for c in df.columns]
+    def update_column_options(schema, plot_type, current_x_opts, current_y_opts, current_size_opts, current_size):
+        numeric, categorical = schema["numeric"], schema["categorical"]
 
         # determine allowed columns depending on plot type
         if plot_type == "scatter":
             x_opts = [{"label": c, "value": c} for c in numeric]
             y_opts = [{"label": c, "value": c} for c in numeric]
             size_opts = [{"label": c, "value": c} for c in numeric]
-            color_opts = all_options
         elif plot_type in ("box", "violin"):
             # box/violin: x categorical, y numeric
             x_opts = [{"label": c, "value": c} for c in categorical]
             y_opts = [{"label": c, "value": c} for c in numeric]
             size_opts = []
-            color_opts = all_options
         elif plot_type == "bar":
             # bar: x categorical, y numeric (aggregation)
             x_opts = [{"label": c, "value": c} for c in categorical]
             y_opts = [{"label": c, "value": c} for c in numeric]
             size_opts = []
-            color_opts = all_options
         elif plot_type == "hist":
             # histogram: x numeric (or categorical optionally)
             x_opts = [{"label": c, "value": c} for c in numeric + categorical]
             y_opts = []
             size_opts = []
-            color_opts = all_options
         else:
+            all_options = [{"label": c, "value": c} for c in schema["columns"]]
             x_opts = all_options
             y_opts = all_options
             size_opts = all_options
-            color_opts = all_options
 
         # pick sensible defaults if possible
         def first_or_none(opts):
             return opts[0]["value"] if opts else None
 
-        return x_opts, y_opts, color_opts, size_opts, first_or_none(x_opts), first_or_none(y_opts), None, None
-
-
-    @app.callback(
+        # switching between plot types with the same column rules (e.g. box <-> bar) keeps
+        # the current selection and spares update_figure a second trigger
+        if ctx.triggered_id == "plot-type" and (x_opts, y_opts, size_opts) == (current_x_opts, current_y_opts, current_size_opts):
+            raise PreventUpdate
+
+        # update_figure rebuilds for the new x/y anyway; only re-send the size value if it changes
+        return (x_opts, y_opts, size_opts, first_or_none(x_opts), first_or_none(y_opts),
+                None if current_size else no_update)
+
+
+    # Hide size for box/violin; hide y for histogram. Runs in the browser, no server round trip
+    app.clientside_callback(
+        """
+        function(plotType) {
+            const sizeStyle = (plotType === "box" || plotType === "violin") ? {display: "none"} : {};
+            const yStyle = plotType === "hist" ? {display: "none"} : {};
+            return [sizeStyle, yStyle];
+        }
+        """,
         Output("size-container", "style"),
         Output("y-container", "style"),
         Input("plot-type", "value"),
     )
-    def toggle_visibility(plot_type):
-        # Hide size for box/violin; hide y for histogram
-        size_style = {"display": "none"} if plot_type in ("box", "violin") else {}
-        y_style = {"display": "none"} if plot_type == "hist" else {}
-        return size_style, y_style
 
 
     @app.callback(
         Output("main-graph", "figure"),
+        Output("rendered-style", "data"),
         Input("df-store", "data"),
         Input("plot-type", "value"),
         Input("x-column", "value"),
         Input("y-column", "value"),
-        Input("color-column", "value"),
-        Input("size-column", "value"),
+        Input("renderer", "value"),
+        Input("style-request", "data"),
+        State("color-column", "value"),
+        State("size-column", "value"),
+        # build in a worker process so one large plot does not block other sessions;
+        # a newer trigger cancels the job still running for the previous one. Color and
+        # size are State: scatter style changes are patched by update_style and never
+        # cancel a rebuild, grouped plots come back here through `style-request`
+        background=True,
+        interval=250,
     )
-    def update_figure(df_json, plot_type, x, y, color, size):
-        df = safe_read_json(df_json)
+    def update_figure(df_key, plot_type, x, y, renderer, style_request, color, size):
+        return build_figure(df_key, plot_type, x, y, color, size, renderer), {"color": color, "size": size}
 
-        # Basic guard
-        if df is None or df.shape[0] == 0:
-            return {}
 
-        try:
-            if plot_type == "scatter":
-                if not x or not y:
-                    return px.scatter(df, title="Select X and Y columns")
-                fig = px.scatter(df, x=x, y=y, color=color if color else None, size=size if size else None, hover_data=df.columns)
-            elif plot_type == "box":
-                if not x or not y:
-                    return px.box(df, title="Select X (categorical) and Y (numeric)")
-                fig = px.box(df, x=x, y=y, color=color if color else None)
-            elif plot_type == "violin":
-                if not x or not y:
-                    return px.violin(df, title="Select X (categorical) and Y (numeric)")
-                fig = px.violin(df, x=x, y=y, color=color if color else None)
-            elif plot_type == "bar":
-                if not x or not y:
-                    return px.bar(df, title="Select X (categorical) and Y (numeric)")
-                fig = px.bar(df, x=x, y=y, color=color if color else None)
-            elif plot_type == "hist":
-                if not x:
-                    return px.histogram(df, title="Select X column")
-                fig = px.histogram(df, x=x, color=color if color else None)
-            else:
-                fig = px.scatter(df, x=x, y=y, color=color if color else None)
-
-            fig.update_layout(transition_duration=200)
-            return fig
-        except Exception as e:
-            # return a simple figure with error message
-            return px.scatter(title=f"Error building plot: {e}")
+    @app.callback(
+        Output("main-graph", "figure", allow_duplicate=True),
+        Output("style-request", "data"),
+        Input("color-column", "value"),
+        Input("size-column", "value"),
+        Input("rendered-style", "data"),
+        State("df-store", "data"),
+        State("plot-type", "value"),
+        State("x-column", "value"),
+        State("y-column", "value"),
+        State("renderer", "value"),
+        prevent_initial_call=True,
+    )
+    def update_style(color, size, rendered, df_key, plot_type, x, y, renderer):
+        # a rebuild that finished after the user changed color/size still holds
+        # the old style: reconcile it here; otherwise it is up to date
+        if ctx.triggered_id == "rendered-style" and rendered == {"color": color, "size": size}:
+            raise PreventUpdate
+        # color/size cannot change a "Select ..." placeholder figure
+        if not x or (not y and plot_type != "hist"):
+            raise PreventUpdate
+        if plot_type != "scatter":
+            # the other plots group by color, so they are rebuilt in the background
+            return no_update, {"color": color, "size": size}
+        # the scatter trace is styled through its marker and patched in place
+        plot_df = sample_rows(load_df(df_key))
+        patched = Patch()
+        patched["data"][0]["marker"] = scatter_marker(plot_df, color, size)
+        hover = scatter_hover(plot_df, x, y, color, size)
+        patched["data"][0]["customdata"] = hover["customdata"]
+        patched["data"][0]["hovertemplate"] = hover["hovertemplate"]
+        return patched, no_update
 
 
     return app
 
 
 if __name__ == "__main__":
-    import os
     app = create_app()
     # `run_server` was deprecated and replaced by `run` in newer Dash versions
     # use app.run(...) which mirrors the new API
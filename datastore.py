@@ -0,0 +1,164 @@
+"""Server-side dataset store shared by dash_plotter.py and eda_dashboard.py.
+
+- DataFrame cache (Arrow IPC payloads keyed by content hash)
+- CSV/Excel upload parsing
+
+Dependencies: pandas, pyarrow, flask-caching
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import io
+import os
+import tempfile
+from functools import lru_cache
+from typing import Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+from flask_caching import Cache
+
+
+# Arrow CSV reader block size, and rows per chunk for the pandas fallback
+CSV_BLOCK_SIZE = 8 << 20
+CSV_CHUNKSIZE = 200_000
+
+# Uploads with these extensions are read as Excel workbooks, as are files starting
+# with a ZIP (xlsx/xlsm/xlsb/ods) or OLE2 (xls) signature; anything else as CSV
+EXCEL_SUFFIXES = (".xls", ".xlsx", ".xlsm", ".xlsb", ".ods")
+EXCEL_SIGNATURES = (b"PK\x03\x04", b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1")
+
+# Server-side DataFrame cache, bound to the app's Flask server with `cache_config`.
+# The browser stores only the key of the active dataset.
+cache = Cache()
+
+
+def cache_config(name: str) -> dict:
+    """FileSystemCache config keeping up to 50 datasets in a temp directory called `name`."""
+    return {
+        "CACHE_TYPE": "FileSystemCache",
+        "CACHE_DIR": os.path.join(tempfile.gettempdir(), name),
+        "CACHE_DEFAULT_TIMEOUT": 0,
+        "CACHE_THRESHOLD": 50,
+    }
+
+
+def df_to_arrow(df: pd.DataFrame) -> bytes:
+    """Encode a DataFrame as Arrow IPC bytes."""
+    # written as a table stream: serialize_pandas builds a single record batch and
+    # rejects the chunked string arrays of frames read in blocks or chunks
+    table = pa.Table.from_pandas(df)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def df_from_arrow(data: bytes) -> pd.DataFrame:
+    """Decode Arrow IPC bytes written by `df_to_arrow`."""
+    return pa.ipc.deserialize_pandas(data)
+
+
+def content_key(data: bytes) -> str:
+    """Short content hash used as the cache key for a dataset."""
+    return hashlib.sha1(data).hexdigest()[:16]
+
+
+class DatasetExpired(LookupError):
+    """Raised by `load_df` when a dataset has been evicted from the server-side cache."""
+
+
+# Frames kept in process memory rather than the cache (the built-in demo datasets),
+# so that eviction never breaks a fresh page load
+_pinned = {}
+
+
+def store_df(df: pd.DataFrame, key: Optional[str] = None, pin: bool = False) -> str:
+    """Put `df` in the server-side cache (or keep it in memory when `pin`) and return its key."""
+    payload = df_to_arrow(df)
+    key = key or content_key(payload)
+    if pin:
+        _pinned[key] = df
+    else:
+        cache.set(key, payload)
+    return key
+
+
+@lru_cache(maxsize=8)
+def load_df(key: str) -> pd.DataFrame:
+    """Return the cached DataFrame for `key`, decoded once per process."""
+    if key in _pinned:
+        return _pinned[key]
+    payload = cache.get(key)
+    if payload is None:
+        raise DatasetExpired(key)
+    return df_from_arrow(payload)
+
+
+def read_csv_bytes(data: bytes) -> pd.DataFrame:
+    """Parse CSV bytes with Arrow's multithreaded reader, falling back to pandas.
+
+    Headers with duplicate or empty names go through pandas, which renames them
+    (`a.1`, `Unnamed: 2`) the way every other code path expects.
+    """
+    try:
+        table = pacsv.read_csv(io.BytesIO(data), read_options=pacsv.ReadOptions(block_size=CSV_BLOCK_SIZE))
+    except pa.ArrowInvalid:
+        table = None
+    if table is None or "" in table.column_names or len(set(table.column_names)) < table.num_columns:
+        # parse in chunks so the tokenizer never holds the whole file at once
+        reader = pd.read_csv(io.BytesIO(data), chunksize=CSV_CHUNKSIZE, low_memory=True, engine="c")
+        return pd.concat(reader, ignore_index=True)
+    return _restore_uint64(table, data).to_pandas(split_blocks=True, self_destruct=True)
+
+
+def read_upload(contents: str, filename: str) -> pd.DataFrame:
+    """Parse a `dcc.Upload` contents string as Excel or CSV, chosen by file extension
+    or, for files saved without one, by content."""
+    is_excel = (filename or "").lower().endswith(EXCEL_SUFFIXES)
+    try:
+        header, encoded = contents.split(",", 1)
+        data = base64.b64decode(encoded)
+        is_excel = is_excel or data.startswith(EXCEL_SIGNATURES)
+        df = pd.read_excel(io.BytesIO(data)) if is_excel else read_csv_bytes(data)
+    except Exception as e:
+        # report the error of the parser that applies, not of a fallback guess
+        raise ValueError(f"Unable to parse uploaded file '{filename}' as {'Excel' if is_excel else 'CSV'}: {e}") from e
+    return _stringify_mixed(df)
+
+
+def _stringify_mixed(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast object columns mixing numbers and strings to `str`, which Arrow can store.
+
+    Such columns come from Excel sheets and from the chunked pandas CSV fallback,
+    where each chunk infers its dtypes on its own.
+    """
+    for col, dtype in df.dtypes.items():
+        if pd.api.types.is_object_dtype(dtype) and pd.api.types.infer_dtype(df[col]) in ("mixed", "mixed-integer"):
+            df[col] = df[col].astype(str)
+    return df
+
+
+def _restore_uint64(table: pa.Table, data: bytes) -> pa.Table:
+    """Re-read as uint64 the columns Arrow inferred as double only because their
+    integers exceed the int64 range (pandas reads those as uint64)."""
+    for i, (name, column) in enumerate(zip(table.column_names, table.columns)):
+        if column.type != pa.float64() or column.null_count:
+            continue
+        hi = pc.max(column).as_py()
+        if not (hi is not None and 2 ** 63 <= hi <= 2 ** 64 and pc.min(column).as_py() >= 0
+                and pc.all(pc.equal(pc.floor(column), column)).as_py()):
+            continue
+        try:
+            exact = pacsv.read_csv(io.BytesIO(data), read_options=pacsv.ReadOptions(block_size=CSV_BLOCK_SIZE),
+                                   convert_options=pacsv.ConvertOptions(include_columns=[name],
+                                                                        column_types={name: pa.uint64()}))
+        except pa.ArrowInvalid:
+            # values past the uint64 range stay doubles, as in pandas
+            continue
+        table = table.set_column(i, name, exact[name])
+    return table
@@ -8,8 +8,8 @@ Features:
 - Tab 3 (Inspector): Analyze individual columns (stats for numeric, counts for categorical)
 - Tab 4 (Correlations): Pairwise correlation heatmap with Pearson/Spearman toggle
 
-Dependencies: dash, pandas, plotly, scipy (for Spearman correlation)
-Install: pip install dash pandas plotly scipy
+Dependencies: dash, pandas, plotly, scipy (for Spearman correlation), pyarrow, flask-caching, orjson
+Install: pip install dash pandas plotly scipy pyarrow flask-caching orjson
 
 Run: python eda_dashboard.py
 Then open http://127.0.0.1:8050 in your browser.
@@ -17,120 +17,297 @@ Then open http://127.0.0.1:8050 in your browser.
 
 from __future__ import annotations
 
-import base64
-import io
+import math
+from functools import lru_cache
 from typing import List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objs as go
-from scipy.stats import spearmanr
-from dash import Dash, dcc, html, Input, Output, State, callback
-
-
-def safe_read_json(json_string: str) -> pd.DataFrame:
-    """Safely read JSON from string using StringIO to avoid FutureWarning."""
-    return pd.read_json(io.StringIO(json_string), orient="split")
-
-
-def infer_column_types(df: pd.DataFrame, cat_threshold: int = 20) -> Tuple[List[str], List[str]]:
-    """Return numeric and categorical column lists.
-
-    Numeric = pandas numeric dtypes.
-    Categorical = object/category/bool OR numeric columns with low cardinality.
+import plotly.io as pio
+from scipy.stats import rankdata
+from dash import Dash, dcc, html, dash_table, Input, Output, State, callback, no_update, set_props
+
+from common import MAX_HIST_BINS, histogram_traces, infer_column_types, probe_values
+from datastore import DatasetExpired, cache, cache_config, load_df, read_upload, store_df
+
+
+# Server-side DataFrame cache (see datastore.py); `eda-df-store` only holds the id of the active dataset
+CACHE_CONFIG = cache_config("eda_dashboard_cache")
+
+# Fixed bin count of the Inspector histogram (the Tab 1 histogram bins "auto", capped at MAX_HIST_BINS)
+INSPECTOR_HIST_BINS = 30
+# Categories shown in the Inspector value-count bar chart
+MAX_BAR_CATEGORIES = 50
+# Scatter plots above this many rows draw a random sample unless "show all" is on
+MAX_POINTS = 20_000
+# Wider correlation heatmaps drop the per-cell labels and rely on hover
+MAX_LABELLED_HEATMAP_COLS = 20
+# Inspector value counts on longer columns are estimated from a sample this size
+VALUE_COUNT_SAMPLE = 200_000
+# Rows per Data Table page; only the visible page is sent to the browser
+TABLE_PAGE_SIZE = 20
+
+# DataTable filter operators, longest spelling first (from the Dash custom filtering docs)
+FILTER_OPERATORS = [
+    ["ge ", ">="],
+    ["le ", "<="],
+    ["lt ", "<"],
+    ["gt ", ">"],
+    ["ne ", "!="],
+    ["eq ", "="],
+    ["contains "],
+    ["datestartswith "],
+]
+
+
+def shrink_dtypes(df: pd.DataFrame, max_ratio: float = 0.5) -> pd.DataFrame:
+    """Downcast numeric columns and turn repeated strings into categoricals.
+
+    Integers take the smallest dtype that holds them. Floats drop to float32
+    only when that is lossless, so displayed values never change.
     """
-    numeric = df.select_dtypes(include=["number"]).columns.tolist()
-    categorical = df.select_dtypes(include=["object", "category", "bool"]).columns.tolist()
-
-    # Consider numeric columns with low unique counts as categorical
-    for col in numeric:
-        try:
-            if df[col].nunique(dropna=True) <= cat_threshold:
-                categorical.append(col)
-        except Exception:
-            pass
-
-    # Dedupe
-    categorical = [c for i, c in enumerate(categorical) if c not in categorical[:i]]
-    return numeric, categorical
+    for col, dtype in df.dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype) or pd.api.types.is_bool_dtype(dtype):
+            continue
+        if isinstance(dtype, np.dtype) and dtype.kind in "iu":
+            df[col] = pd.to_numeric(df[col], downcast="integer" if dtype.kind == "i" else "unsigned")
+        elif isinstance(dtype, np.dtype) and dtype.kind == "f" and dtype.itemsize > 4:
+            values = df[col].to_numpy()
+            narrow = values.astype(np.float32)
+            if np.array_equal(narrow.astype(dtype), values, equal_nan=True):
+                df[col] = narrow
+        elif pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype):
+            if df[col].nunique() < max_ratio * len(df):
+                df[col] = df[col].astype("category")
+    return df
 
 
 def parse_upload(contents: str, filename: str) -> pd.DataFrame:
-    """Parse uploaded file (CSV or Excel)."""
-    header, encoded = contents.split(",", 1)
-    data = base64.b64decode(encoded)
-    try:
-        return pd.read_csv(io.BytesIO(data))
-    except Exception:
-        try:
-            return pd.read_excel(io.BytesIO(data))
-        except Exception as e:
-            raise ValueError(f"Unable to parse uploaded file '{filename}': {e}")
+    """Parse uploaded file (CSV or Excel) with compact dtypes."""
+    return shrink_dtypes(read_upload(contents, filename))
 
 
 def compute_numeric_stats(series: pd.Series) -> dict:
     """Compute descriptive stats for a numeric series."""
-    clean = series.dropna()
+    values = series.dropna().to_numpy(dtype=np.float64)
+    if len(values) == 0:
+        return dict.fromkeys(["mean", "median", "mode", "std", "min", "max", "q1", "q3"], np.nan)
+    # one sort for all three quantiles, one hash pass for the mode
+    q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+    uniques, counts = np.unique(values, return_counts=True)
     return {
-        "mean": clean.mean(),
-        "median": clean.median(),
-        "mode": clean.mode()[0] if len(clean.mode()) > 0 else np.nan,
-        "std": clean.std(),
-        "min": clean.min(),
-        "max": clean.max(),
-        "q1": clean.quantile(0.25),
-        "q3": clean.quantile(0.75),
+        "mean": values.mean(),
+        "median": median,
+        "mode": uniques[counts.argmax()],
+        "std": values.std(ddof=1) if len(values) > 1 else np.nan,
+        "min": values.min(),
+        "max": values.max(),
+        "q1": q1,
+        "q3": q3,
     }
 
 
-def create_correlation_matrix(df: pd.DataFrame, method: str = "pearson") -> np.ndarray:
-    """Compute correlation matrix (only numeric columns).
-    
+def _corr_block(values: np.ndarray, method: str) -> np.ndarray:
+    """Correlation matrix of the columns of a NaN-free 2D array."""
+    if method == "spearman":
+        # rank every column once; Spearman is Pearson on the ranks
+        values = rankdata(values, axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.atleast_2d(np.corrcoef(values, rowvar=False))
+
+
+def _corr_row(target: np.ndarray, others: np.ndarray, method: str) -> np.ndarray:
+    """Correlations of a NaN-free 1D array against each column of `others`.
+
+    One matrix-vector product, instead of the full matrix `_corr_block` would
+    build when only one of its rows is needed.
+    """
+    if method == "spearman":
+        target, others = rankdata(target), rankdata(others, axis=0)
+    target = target - target.mean()
+    others = others - others.mean(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = (target @ others) / np.sqrt((target @ target) * np.einsum("ij,ij->j", others, others))
+    return np.clip(corr, -1.0, 1.0)
+
+
+def create_correlation_matrix(values: np.ndarray, method: str = "pearson") -> Optional[np.ndarray]:
+    """Compute the correlation matrix of the columns of a float array (NaN = missing).
+
     Handles missing data by dropping rows pairwise for each correlation.
+    Pairs with fewer than 2 valid rows (or zero variance) get 0.
     """
-    numeric_df = df.select_dtypes(include=["number"])
-    if numeric_df.shape[1] < 2:
+    n_cols = values.shape[1]
+    if n_cols < 2:
         return None
-    
-    n_cols = numeric_df.shape[1]
-    corr_matrix = np.zeros((n_cols, n_cols))
-    col_names = numeric_df.columns.tolist()
-    
-    for i in range(n_cols):
-        for j in range(n_cols):
-            if i == j:
-                corr_matrix[i, j] = 1.0
-            else:
-                # Drop rows where either column has NaN (pairwise deletion)
-                valid_mask = numeric_df.iloc[:, i].notna() & numeric_df.iloc[:, j].notna()
-                valid_data_i = numeric_df.iloc[:, i][valid_mask].values
-                valid_data_j = numeric_df.iloc[:, j][valid_mask].values
-                
-                if len(valid_data_i) > 1:  # Need at least 2 points for correlation
-                    if method == "spearman":
-                        corr, _ = spearmanr(valid_data_i, valid_data_j)
-                    else:  # pearson
-                        corr = np.corrcoef(valid_data_i, valid_data_j)[0, 1]
-                    corr_matrix[i, j] = corr if not np.isnan(corr) else 0.0
-                else:
-                    corr_matrix[i, j] = 0.0
-    
+
+    has_nan = np.isnan(values).any(axis=0)
+    corr_matrix = np.full((n_cols, n_cols), np.nan)
+
+    # Complete columns: one vectorized pass over the whole block
+    dense = np.flatnonzero(~has_nan)
+    if len(dense) > 1:
+        corr_matrix[np.ix_(dense, dense)] = _corr_block(values[:, dense], method)
+
+    # Columns with gaps: pairwise deletion. Against the complete columns the valid
+    # rows are just those of column j, so those pairs are still one vectorized pass.
+    # The matrix is symmetric: each pair is computed once and mirrored
+    gappy = np.flatnonzero(has_nan)
+    for j in gappy:
+        rows = ~np.isnan(values[:, j])
+        if rows.sum() > 1 and len(dense):
+            corr_matrix[j, dense] = corr_matrix[dense, j] = _corr_row(values[rows, j], values[np.ix_(rows, dense)], method)
+        for i in gappy[gappy > j]:
+            both = rows & ~np.isnan(values[:, i])
+            if both.sum() > 1:
+                corr_matrix[i, j] = corr_matrix[j, i] = _corr_row(values[both, j], values[both, i][:, None], method)[0]
+
+    corr_matrix = np.nan_to_num(corr_matrix, nan=0.0)
+    np.fill_diagonal(corr_matrix, 1.0)
     return corr_matrix
 
 
+def split_filter_part(filter_part: str) -> Tuple[Optional[str], Optional[str], object]:
+    """Split one `{col} op value` clause of a DataTable filter query."""
+    for operator_type in FILTER_OPERATORS:
+        for operator in operator_type:
+            if operator in filter_part:
+                name_part, value_part = filter_part.split(operator, 1)
+                name = name_part[name_part.find("{") + 1: name_part.rfind("}")]
+                value_part = value_part.strip()
+                v0 = value_part[:1]
+                if v0 and v0 == value_part[-1] and v0 in ("'", '"', "`"):
+                    value = value_part[1:-1].replace("\\" + v0, v0)
+                else:
+                    try:
+                        value = float(value_part)
+                    except ValueError:
+                        value = value_part
+                return name, operator_type[0].strip(), value
+    return None, None, None
+
+
+def filter_mask(df: pd.DataFrame, filter_query: str) -> np.ndarray:
+    """Boolean row mask for a DataTable `filter_query` (clauses joined by ` && `)."""
+    mask = np.ones(len(df), dtype=bool)
+    for part in filter_query.split(" && "):
+        col, op, value = split_filter_part(part)
+        if col not in df.columns:
+            continue
+        s = df[col]
+        if op in ("eq", "ne", "lt", "le", "gt", "ge"):
+            if isinstance(s.dtype, pd.CategoricalDtype):
+                s = s.astype(object)
+            if pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s):
+                # `{num} < abc` matches nothing rather than comparing against a string
+                value = pd.to_numeric(value, errors="coerce")
+            try:
+                hit = getattr(s, op)(value) if not pd.isna(value) else pd.Series(False, index=s.index)
+            except TypeError:
+                # e.g. `{text} > 5` or `{date} > 5`: values of different types match nothing
+                hit = pd.Series(False, index=s.index)
+        elif op == "contains":
+            hit = s.astype(str).str.contains(str(value), regex=False)
+        else:
+            hit = s.astype(str).str.startswith(str(value))
+        mask &= hit.fillna(False).to_numpy(dtype=bool)
+    return mask
+
+
+@lru_cache(maxsize=8)
+def table_rows(df_id: str, sort_by: Tuple[Tuple[str, str], ...], filter_query: str) -> np.ndarray:
+    """Positions of the rows of `df_id` left after filtering and sorting, memoized
+    so that paging through a result does not redo either step."""
+    df = load_df(df_id)
+    rows = np.flatnonzero(filter_mask(df, filter_query)) if filter_query else np.arange(len(df))
+    if sort_by:
+        view = df.iloc[rows].reset_index(drop=True)
+        order = view.sort_values(
+            [col for col, _ in sort_by],
+            ascending=[direction == "asc" for _, direction in sort_by],
+            kind="stable",
+        ).index.to_numpy()
+        rows = rows[order]
+    return rows
+
+
+@lru_cache(maxsize=8)
+def column_types(df_id: str) -> Tuple[List[str], List[str]]:
+    """Memoized `infer_column_types` for the cached dataset `df_id`."""
+    return infer_column_types(load_df(df_id))
+
+
+def dataset_stores(df_id: str) -> Tuple[List[str], List[str], dict]:
+    """Numeric columns, categorical columns and {n_rows, columns} for `df_id`,
+    the contents of the stores that accompany `eda-df-store`."""
+    df = load_df(df_id)
+    numeric, categorical = column_types(df_id)
+    return numeric, categorical, {"n_rows": len(df), "columns": df.columns.tolist()}
+
+
+def sampled_value_counts(series: pd.Series) -> Tuple[pd.Series, bool]:
+    """Value counts of `series`, estimated from a fixed-size random sample when it is long.
+
+    Returns the counts (scaled to the full length when sampled) and whether
+    they are estimates.
+    """
+    if len(series) <= VALUE_COUNT_SAMPLE:
+        return series.value_counts(), False
+    counts = series.sample(VALUE_COUNT_SAMPLE, random_state=0).value_counts()
+    return counts * (len(series) / VALUE_COUNT_SAMPLE), True
+
+
+def summary_text(meta: dict) -> str:
+    return f"{meta['n_rows']} rows × {len(meta['columns'])} columns"
+
+
+@lru_cache(maxsize=8)
+def numeric_values(df_id: str) -> Tuple[List[str], np.ndarray]:
+    """Names and float64 values (NaN = missing) of the numeric columns of `df_id`,
+    extracted once per dataset for the correlation tab."""
+    df = load_df(df_id)
+    numeric, _ = column_types(df_id)
+    values = np.empty((len(df), len(numeric)))
+    for i, col in enumerate(numeric):
+        values[:, i] = probe_values(df[col]).real
+    return numeric, values
+
+
+@lru_cache(maxsize=16)
+def correlation_matrix(df_id: str, method: str) -> Optional[np.ndarray]:
+    """Memoized `create_correlation_matrix` for the cached dataset `df_id`."""
+    return create_correlation_matrix(numeric_values(df_id)[1], method=method)
+
+
 def create_app() -> Dash:
-    app = Dash(__name__)
+    # Dash encodes callback responses through plotly's JSON layer; use orjson there
+    pio.json.config.default_engine = "orjson"
+    def on_callback_error(err):
+        # callbacks reading an evicted dataset keep their outputs and say why
+        if isinstance(err, DatasetExpired):
+            set_props("eda-upload-filename", {"children": "❌ This dataset is no longer cached on the server; please upload it again"})
+            return None
+        raise err
+
+    app = Dash(__name__, on_error=on_callback_error)
+    cache.init_app(app.server, config=CACHE_CONFIG)
 
     demo_df = px.data.tips()
+    # pinned in memory: every fresh page load starts from this id
+    demo_id = store_df(demo_df, pin=True)
+    # filled here for the demo data, so no callback has to derive them at startup
+    demo_numeric, demo_categorical, demo_meta = dataset_stores(demo_id)
 
     app.layout = html.Div([
         html.H2("📊 EDA Dashboard — Exploratory Data Analysis", style={"textAlign": "center", "marginBottom": 20}),
 
         # Store for dataframe
-        dcc.Store(id="eda-df-store", data=demo_df.to_json(date_format="iso", orient="split")),
-        dcc.Store(id="eda-numeric-cols-store"),
-        dcc.Store(id="eda-categorical-cols-store"),
+        dcc.Store(id="eda-df-store", data=demo_id),
+        dcc.Store(id="eda-numeric-cols-store", data=demo_numeric),
+        dcc.Store(id="eda-categorical-cols-store", data=demo_categorical),
+        dcc.Store(id="eda-meta-store", data=demo_meta),
 
         # Upload section
         html.Div([
@@ -151,10 +328,11 @@ def create_app() -> Dash:
                     },
                     multiple=False,
                 ),
-                html.Div(id="eda-upload-filename", style={"fontSize": 12, "color": "#666"}),
+                html.Div("Using example dataset", id="eda-upload-filename", style={"fontSize": 12, "color": "#666"}),
             ], style={"flex": "1", "minWidth": "200px"}),
 
             html.Div(
+                summary_text(demo_meta),
                 id="eda-data-summary",
                 style={"fontSize": 12, "color": "#444", "marginLeft": 20, "minWidth": "150px"}
             ),
@@ -211,6 +389,10 @@ def create_app() -> Dash:
                                   dcc.Dropdown(id="eda-plot-size-column")], 
                                   id="eda-plot-size-container", 
                                   style={"marginBottom": 8}),
+                        dcc.Checklist(id="eda-plot-all-points",
+                                      options=[{"label": f" Show all points (otherwise {MAX_POINTS:,} sampled)", "value": "all"}],
+                                      value=[],
+                                      style={"fontSize": 12}),
                     ], style={"width": "320px", "flex": "0 0 320px", "paddingLeft": 12}),
 
                 ], style={"display": "flex", "alignItems": "flex-start", "gap": "24px", "margin": 24}),
@@ -224,6 +406,21 @@ def create_app() -> Dash:
                         id="eda-table-loading",
                         children=[
                             html.Div(
+                                dash_table.DataTable(
+                                    id="eda-data-table",
+                                    style_cell={"textAlign": "left", "padding": "8px"},
+                                    style_header={"backgroundColor": "#f0f0f0", "fontWeight": "bold", "borderBottom": "2px solid #ccc"},
+                                    style_data={"border": "1px solid #eee"},
+                                    # paging, sorting and filtering run on the server (see eda_page_data_table)
+                                    page_current=0,
+                                    page_size=TABLE_PAGE_SIZE,
+                                    page_action="custom",
+                                    filter_action="custom",
+                                    filter_query="",
+                                    sort_action="custom",
+                                    sort_mode="multi",
+                                    sort_by=[],
+                                ),
                                 id="eda-data-table-container",
                                 style={"overflowX": "auto", "maxHeight": "85vh"}
                             )
@@ -282,31 +479,24 @@ def create_app() -> Dash:
 
     @app.callback(
         Output("eda-df-store", "data"),
+        Output("eda-numeric-cols-store", "data"),
+        Output("eda-categorical-cols-store", "data"),
+        Output("eda-meta-store", "data"),
         Output("eda-upload-filename", "children"),
         Output("eda-data-summary", "children"),
         Input("eda-upload-data", "contents"),
         State("eda-upload-data", "filename"),
-        State("eda-df-store", "data"),
+        prevent_initial_call=True,
     )
-    def handle_eda_upload(contents, filename, current_json):
-        if contents is None:
-            df = safe_read_json(current_json)
-            return current_json, "Using example dataset", f"{len(df)} rows × {len(df.columns)} columns"
+    def handle_eda_upload(contents, filename):
+        # the dataset id and its column stores are written together, so each
+        # dependent callback runs once per upload
         try:
-            df = parse_upload(contents, filename)
-            return df.to_json(date_format="iso", orient="split"), f"✓ Loaded: {filename}", f"{len(df)} rows × {len(df.columns)} columns"
+            df_id = store_df(parse_upload(contents, filename))
         except Exception as e:
-            return current_json, f"❌ Upload failed: {e}", ""
-
-    @app.callback(
-        Output("eda-numeric-cols-store", "data"),
-        Output("eda-categorical-cols-store", "data"),
-        Input("eda-df-store", "data"),
-    )
-    def update_column_type_stores(df_json):
-        df = safe_read_json(df_json)
-        numeric, categorical = infer_column_types(df)
-        return numeric, categorical
+            return no_update, no_update, no_update, no_update, f"❌ Upload failed: {e}", ""
+        numeric, categorical, meta = dataset_stores(df_id)
+        return df_id, numeric, categorical, meta, f"✓ Loaded: {filename}", summary_text(meta)
 
     # ===== TAB 1: PLOT CALLBACKS =====
 
@@ -319,14 +509,14 @@ def create_app() -> Dash:
         Output("eda-plot-y-column", "value"),
         Output("eda-plot-color-column", "value"),
         Output("eda-plot-size-column", "value"),
-        Input("eda-df-store", "data"),
+        Input("eda-numeric-cols-store", "data"),
+        Input("eda-categorical-cols-store", "data"),
         Input("eda-plot-type", "value"),
+        State("eda-meta-store", "data"),
     )
-    def eda_update_plot_options(df_json, plot_type):
-        df = safe_read_json(df_json)
-        numeric, categorical = infer_column_types(df)
-
-        all_options = [{"label": c, "value": c} for c in df.columns]
+    def eda_update_plot_options(numeric, categorical, plot_type, meta):
+        # column types come from the stores filled once per dataset
+        all_options = [{"label": c, "value": c} for c in meta["columns"]]
 
         if plot_type == "scatter":
             x_opts = [{"label": c, "value": c} for c in numeric]
@@ -377,9 +567,10 @@ def create_app() -> Dash:
         Input("eda-plot-y-column", "value"),
         Input("eda-plot-color-column", "value"),
         Input("eda-plot-size-column", "value"),
+        Input("eda-plot-all-points", "value"),
     )
-    def eda_update_plot(df_json, plot_type, x, y, color, size):
-        df = safe_read_json(df_json)
+    def eda_update_plot(df_id, plot_type, x, y, color, size, all_points):
+        df = load_df(df_id)
 
         if df is None or df.shape[0] == 0:
             return {}
@@ -388,10 +579,14 @@ def create_app() -> Dash:
             if plot_type == "scatter":
                 if not x or not y:
                     return px.scatter(df, title="Select X and Y columns")
-                fig = px.scatter(df, x=x, y=y, 
+                # only ship a sample of large frames; hover shows the plotted columns
+                sampled = len(df) > MAX_POINTS and not all_points
+                plot_df = df.sample(MAX_POINTS, random_state=0) if sampled else df
+                fig = px.scatter(plot_df, x=x, y=y, 
                                  color=color if color else None, 
-                                 size=size if size else None, 
-                                 hover_data=df.columns)
+                                 size=size if size else None)
+                if sampled:
+                    fig.update_layout(title=f"Random sample of {MAX_POINTS:,} of {len(df):,} rows")
             elif plot_type == "box":
                 if not x or not y:
                     return px.box(df, title="Select X (categorical) and Y (numeric)")
@@ -407,7 +602,8 @@ def create_app() -> Dash:
             elif plot_type == "hist":
                 if not x:
                     return px.histogram(df, title="Select X column")
-                fig = px.histogram(df, x=x, color=color if color else None)
+                fig = go.Figure(histogram_traces(df, x, color if color else None, max_bins=MAX_HIST_BINS))
+                fig.update_layout(barmode="relative", bargap=0, xaxis_title=x, yaxis_title="count")
             else:
                 fig = px.scatter(df, x=x, y=y)
 
@@ -420,54 +616,65 @@ def create_app() -> Dash:
 
     @app.callback(
         Output("eda-table-summary", "children"),
-        Input("eda-df-store", "data"),
+        Input("eda-meta-store", "data"),
     )
-    def eda_update_table_summary(df_json):
-        df = safe_read_json(df_json)
-        return f"Showing {len(df)} rows × {len(df.columns)} columns"
+    def eda_update_table_summary(meta):
+        return f"Showing {meta['n_rows']} rows × {len(meta['columns'])} columns"
 
     @app.callback(
-        Output("eda-data-table-container", "children"),
+        Output("eda-data-table", "columns"),
+        Output("eda-data-table", "page_current"),
+        Output("eda-data-table", "sort_by"),
+        Output("eda-data-table", "filter_query"),
         Input("eda-df-store", "data"),
     )
-    def eda_update_data_table(df_json):
-        from dash import dash_table
-
-        df = safe_read_json(df_json)
-        return dash_table.DataTable(
-            data=df.to_dict("records"),
-            columns=[{"name": i, "id": i} for i in df.columns],
-            style_cell={"textAlign": "left", "padding": "8px"},
-            style_header={"backgroundColor": "#f0f0f0", "fontWeight": "bold", "borderBottom": "2px solid #ccc"},
-            style_data={"border": "1px solid #eee"},
-            page_size=20,
-            filter_action="native",
-            sort_action="native",
-            page_action="native",
-        )
+    def eda_update_data_table(df_id):
+        df = load_df(df_id)
+        columns = [
+            {"name": c, "id": c, "type": "numeric" if pd.api.types.is_numeric_dtype(df[c]) else "text"}
+            for c in df.columns
+        ]
+        return columns, 0, [], ""
+
+    @app.callback(
+        Output("eda-data-table", "data"),
+        Output("eda-data-table", "page_count"),
+        Input("eda-data-table", "page_current"),
+        Input("eda-data-table", "page_size"),
+        Input("eda-data-table", "sort_by"),
+        Input("eda-data-table", "filter_query"),
+        State("eda-df-store", "data"),
+    )
+    def eda_page_data_table(page_current, page_size, sort_by, filter_query, df_id):
+        df = load_df(df_id)
+        sort_key = tuple((s["column_id"], s["direction"]) for s in sort_by or [])
+        rows = table_rows(df_id, sort_key, filter_query or "")
+        start = (page_current or 0) * page_size
+        page = df.iloc[rows[start:start + page_size]]
+        return page.to_dict("records"), max(1, math.ceil(len(rows) / page_size))
 
     # ===== TAB 3: INSPECTOR CALLBACKS =====
 
     @app.callback(
         Output("eda-inspector-column", "options"),
         Output("eda-inspector-column", "value"),
-        Input("eda-df-store", "data"),
+        Input("eda-meta-store", "data"),
     )
-    def eda_update_inspector_columns(df_json):
-        df = safe_read_json(df_json)
-        opts = [{"label": c, "value": c} for c in df.columns]
-        return opts, df.columns[0] if len(df.columns) > 0 else None
+    def eda_update_inspector_columns(meta):
+        columns = meta["columns"]
+        opts = [{"label": c, "value": c} for c in columns]
+        return opts, columns[0] if columns else None
 
     @app.callback(
         Output("eda-inspector-missing-alert", "children"),
         Input("eda-df-store", "data"),
         Input("eda-inspector-column", "value"),
     )
-    def eda_update_inspector_missing(df_json, column):
+    def eda_update_inspector_missing(df_id, column):
         if not column:
             return ""
 
-        df = safe_read_json(df_json)
+        df = load_df(df_id)
         missing_count = df[column].isna().sum()
         missing_pct = (missing_count / len(df)) * 100
 
@@ -491,11 +698,11 @@ def create_app() -> Dash:
         Input("eda-numeric-cols-store", "data"),
         Input("eda-categorical-cols-store", "data"),
     )
-    def eda_update_inspector_stats(df_json, column, numeric_cols, categorical_cols):
+    def eda_update_inspector_stats(df_id, column, numeric_cols, categorical_cols):
         if not column:
             return ""
 
-        df = safe_read_json(df_json)
+        df = load_df(df_id)
 
         if column in numeric_cols:
             stats = compute_numeric_stats(df[column])
@@ -514,14 +721,18 @@ def create_app() -> Dash:
                 html.P([html.Strong("IQR: "), f"{stats['q3'] - stats['q1']:.2f}"]),
             ], style={"padding": "12px", "backgroundColor": "#f9f9f9", "borderRadius": "5px"})
         else:
-            value_counts = df[column].value_counts()
+            value_counts, estimated = sampled_value_counts(df[column])
+            approx = "≈" if estimated else ""
             rows = [html.Tr([html.Td(f"{val}:", style={"fontWeight": "bold"}), 
-                             html.Td(f"{count} ({count/len(df)*100:.1f}%)")]) for val, count in value_counts.head(10).items()]
+                             html.Td(f"{approx}{count:.0f} ({approx}{count/len(df)*100:.1f}%)")]) for val, count in value_counts.head(10).items()]
+            note = [html.P(f"Counts estimated from a random sample of {VALUE_COUNT_SAMPLE:,} rows",
+                           style={"fontSize": 11, "color": "#666"})] if estimated else []
             return html.Div([
                 html.H4(f"📊 {column}", style={"marginBottom": 12}),
                 html.P(f"Type: Categorical ({len(df[column].unique())} unique values)"),
                 html.Hr(),
                 html.Table(rows, style={"width": "100%", "fontSize": 12}),
+                *note,
             ], style={"padding": "12px", "backgroundColor": "#f9f9f9", "borderRadius": "5px"})
 
     @app.callback(
@@ -530,16 +741,21 @@ def create_app() -> Dash:
         Input("eda-inspector-column", "value"),
         Input("eda-numeric-cols-store", "data"),
     )
-    def eda_update_inspector_plot(df_json, column, numeric_cols):
+    def eda_update_inspector_plot(df_id, column, numeric_cols):
         if not column:
             return ""
 
-        df = safe_read_json(df_json)
+        df = load_df(df_id)
 
         if column in numeric_cols:
-            fig = px.histogram(df, x=column, nbins=30, title=f"Distribution of {column}")
+            fig = go.Figure(histogram_traces(df, column, bins=INSPECTOR_HIST_BINS))
+            fig.update_layout(title=f"Distribution of {column}", bargap=0, xaxis_title=column, yaxis_title="count")
         else:
-            fig = px.bar(df[column].value_counts(), title=f"Value Counts for {column}")
+            counts, estimated = sampled_value_counts(df[column])
+            counts = counts.head(MAX_BAR_CATEGORIES)
+            fig = go.Figure(go.Bar(x=counts.index.astype(str).to_numpy(), y=counts.to_numpy()))
+            title = f"Value Counts for {column}" + (f" (estimated from {VALUE_COUNT_SAMPLE:,} sampled rows)" if estimated else "")
+            fig.update_layout(title=title, xaxis_title=column, yaxis_title="count")
 
         fig.update_layout(height=500)
         return dcc.Graph(figure=fig)
@@ -550,17 +766,17 @@ def create_app() -> Dash:
         Output("eda-corr-heatmap", "figure"),
         Input("eda-df-store", "data"),
         Input("eda-corr-method", "value"),
-        Input("eda-numeric-cols-store", "data"),
     )
-    def eda_update_corr_heatmap(df_json, method, numeric_cols):
-        df = safe_read_json(df_json)
-        numeric_df = df[numeric_cols]
+    def eda_update_corr_heatmap(df_id, method):
+        col_names, _ = numeric_values(df_id)
 
-        if numeric_df.shape[1] < 2:
+        if len(col_names) < 2:
             return px.scatter(title="Need at least 2 numeric columns to compute correlations")
 
-        corr_matrix = create_correlation_matrix(df, method=method)
-        col_names = numeric_df.columns.tolist()
+        corr_matrix = correlation_matrix(df_id, method)
+
+        # K^2 text labels become the dominant render cost on wide matrices
+        labels = {"texttemplate": "%{z:.2f}", "textfont": {"size": 10}} if len(col_names) <= MAX_LABELLED_HEATMAP_COLS else {}
 
         fig = go.Figure(data=go.Heatmap(
             z=corr_matrix,
@@ -574,9 +790,9 @@ def create_app() -> Dash:
             zmid=0,
             zmin=-1,
             zmax=1,
-            text=np.round(corr_matrix, 2),
-            texttemplate="%{text:.2f}",
-            textfont={"size": 10},
+            # labels are formatted from z in the browser rather than sent twice
+            **labels,
+            hovertemplate="%{x} vs %{y}: %{z:.2f}<extra></extra>",
             colorbar={"title": "Correlation"},
         ))
 
@@ -1,12 +1,12 @@
 """Simple Plotter
 
 Usage:
-  python simple_plotter.py [-i csv_path] [-o output.html]
+  python simple_plotter.py [-i csv_path] [-o output.html[.gz]] [--all-points] [--debug]
 
 Produces an interactive Plotly scatter plot with dropdowns for selecting
 which columns to use for x, y, color, size and theme. Saves an HTML file when
 `-o/--out` is provided, otherwise opens the generated HTML in the default
-web browser.
+web browser (served from memory; `--debug` writes it to a temporary file).
 
 If no csv_path is provided the script will use Plotly's built-in `iris` dataset.
 
@@ -21,16 +21,57 @@ Install: pip install pandas plotly
 from __future__ import annotations
 
 import argparse
+import gzip
+import json
 import tempfile
 import webbrowser
 from pathlib import Path
-from typing import List
+from typing import Callable, List, Optional
 
+import numpy as np
 import pandas as pd
 import plotly.graph_objs as go
 import plotly.express as px
 import plotly.io as pio
 
+from common import discrete_colorscale, exceeds_cardinality
+
+
+# Above this many rows the scatter is drawn with WebGL (Scattergl) instead of SVG
+WEBGL_THRESHOLD = 5000
+# Larger frames are replaced by a random sample of this many rows unless --all-points is given
+MAX_POINTS = 50_000
+# Non-numeric columns with more distinct values than this are not colored by category
+MAX_COLOR_CATEGORIES = 20
+
+# Dropdown buttons only name the column arrays they apply; the arrays themselves are
+# embedded once in layout.meta.arrays. This script, passed as `post_script` to
+# to_html, applies a clicked button's update with the named arrays filled in.
+# plotly writes numeric arrays as base64 typed-array specs; they are decoded on
+# first use so that restyle sees real arrays.
+SHARED_ARRAYS_SCRIPT = """
+var gd = document.getElementById('{plot_id}');
+var arrays = gd.layout.meta.arrays;
+var TYPES = {i1: Int8Array, u1: Uint8Array, i2: Int16Array, u2: Uint16Array,
+	i4: Int32Array, u4: Uint32Array, f4: Float32Array, f8: Float64Array};
+function sharedArray(key) {
+	var v = arrays[key];
+	if (v && v.bdata !== undefined && TYPES[v.dtype]) {
+		var bin = atob(v.bdata), bytes = new Uint8Array(bin.length);
+		for (var i = 0; i < bin.length; i++) bytes[i] = bin.charCodeAt(i);
+		v = arrays[key] = new TYPES[v.dtype](bytes.buffer);
+	}
+	return v;
+}
+gd.on('plotly_buttonclicked', function (ev) {
+	var args = ev.button.args;
+	if (ev.button.method !== 'skip' || !args || !args.length) return;
+	var restyle = Object.assign({}, args[0]);
+	(args[2] || []).forEach(function (attr) { restyle[attr] = [sharedArray(restyle[attr])]; });
+	Plotly.update(gd, restyle, args[1] || {}, [0]);
+});
+"""
+
 
 def load_data(csv_path: str | None) -> pd.DataFrame:
 	"""Load a DataFrame from CSV or return a default sample dataset.
@@ -46,27 +87,33 @@ def load_data(csv_path: str | None) -> pd.DataFrame:
 	else:
 		# Use Plotly's example iris dataset as a sensible default
 		df = px.data.iris()
-	# Reset index to provide a stable text label if needed
-	df = df.reset_index(drop=True)
+	# Reset index to provide a stable text label if needed; skip the copy when it already is one
+	if not (isinstance(df.index, pd.RangeIndex) and df.index.start == 0 and df.index.step == 1):
+		df = df.reset_index(drop=True)
 	return df
 
 
 def is_numeric_series(s: pd.Series) -> bool:
-	try:
-		return pd.api.types.is_numeric_dtype(s)
-	except Exception:
-		return False
+	# dtype kind codes: int, unsigned, float, complex, bool. Nullable pandas dtypes
+	# report the kind of their values; category/string/datetime/timedelta are not numeric
+	return s.dtype.kind in "iufcb"
 
 
 def make_scatter_with_dropdowns(df: pd.DataFrame, default_x: str = None, default_y: str = None) -> go.Figure:
 	"""Create a Plotly Figure with dropdowns for x, y, color and size.
 
-	This implementation embeds arrays for each column into button `args` so
-	that the pure HTML file is fully interactive without any server.
+	This implementation embeds the arrays for each column once in
+	`layout.meta`, and the buttons refer to them by key, so that the pure HTML
+	file is fully interactive without any server. Write the figure with
+	`post_script=SHARED_ARRAYS_SCRIPT` for the x/y/color/size dropdowns to work.
 	"""
 	cols: List[str] = list(df.columns)
+	col_pos = {c: i for i, c in enumerate(cols)}  # dropdown index of each column
+	# Materialize every column and its dtype check once; all dropdowns index these.
+	is_num = {c: is_numeric_series(df[c]) for c in cols}
+	numeric_cols = [c for c in cols if is_num[c]]
+	raw = {c: df[c].to_numpy() for c in cols}
 	# Choose defaults: first two numeric columns or first two columns
-	numeric_cols = [c for c in cols if is_numeric_series(df[c])]
 	if default_x is None:
 		default_x = numeric_cols[0] if len(numeric_cols) >= 1 else cols[0]
 	if default_y is None:
@@ -76,12 +123,12 @@ def make_scatter_with_dropdowns(df: pd.DataFrame, default_x: str = None, default
 
 	# Prepare the base scatter trace
 	marker_kwargs = dict(size=10)
-	# initial color
-	marker_kwargs["color"] = df[default_color].tolist()
 
-	trace = go.Scatter(
-		x=df[default_x].tolist(),
-		y=df[default_y].tolist(),
+	# NumPy arrays let plotly embed typed (base64) arrays instead of JSON lists
+	trace_cls = go.Scattergl if len(df) > WEBGL_THRESHOLD else go.Scatter
+	trace = trace_cls(
+		x=raw[default_x],
+		y=raw[default_y],
 		mode="markers",
 		marker=marker_kwargs,
 		# text=[str(i) for i in df.index],
@@ -93,68 +140,56 @@ def make_scatter_with_dropdowns(df: pd.DataFrame, default_x: str = None, default
 	# Build updatemenus (dropdowns)
 	updatemenus = []
 
-	# Helper to create buttons for a property
-	def make_buttons_for_attr(
-		attr_path: str,
-		transform=lambda col: col.tolist(),
-		method: str = "restyle",
-		relayout_fn: Optional[Callable[[str], dict]] = None,
-		extra_payload: Optional[dict] = None,
-		):
-		"""
-		Build button dicts for updatemenu.
-
-		- attr_path: e.g. "x", "y", "marker.color", "marker.size"
-		- transform: function(series) -> list (how to extract the column values)
-		- method: "restyle" | "update" | "relayout"
-		- "restyle": args = [restyle_dict, [0]]  (change trace attributes for trace 0)
-		- "update": args = [restyle_dict, relayout_dict]  (change trace data AND layout)
-		- "relayout": args = [relayout_dict]  (change layout only)
-		- relayout_fn: callable(col_name) -> dict to be used as relayout_dict (only for "update"/"relayout")
-		- extra_payload: dict of additional restyle items; values may be callables that accept col_name
-		"""
+	# Arrays shared by all dropdowns, keyed by position; the same array object
+	# (e.g. a numeric column used for x, y and color) is stored only once
+	shared_arrays = {}
+	shared_keys = {}
+
+	def share(arr) -> str:
+		key = shared_keys.get(id(arr))
+		if key is None:
+			key = shared_keys[id(arr)] = str(len(shared_arrays))
+			shared_arrays[key] = arr
+		return key
+
+	# Helpers to create buttons for a property
+	# Column buttons are "skip" buttons with args = [restyle_dict, relayout_dict, shared_keys]:
+	# plotly.js leaves them alone and SHARED_ARRAYS_SCRIPT applies them, resolving the
+	# column key in restyle_dict[attr_path] to [array] from `shared_arrays`
+	def restyle_buttons(attr_path: str, arrays: dict, extra_payload: Callable[[str], dict],
+						extra_arrays: Optional[dict] = None):
+		"""Buttons setting trace attribute `attr_path` (e.g. "marker.color") to each
+		column's array in `arrays`, plus the restyle items returned by extra_payload(col).
+		extra_arrays may map a column to further {attr: array} items, shared the same way."""
+		extra_arrays = extra_arrays or {}
 		buttons = []
 		for col in cols:
-			arr = transform(df[col])
-
-			# Build restyle dict only when relevant
-			restyle_dict = None
-			if method in ("restyle", "update"):
-				restyle_dict = {attr_path: [arr]}  # wrap in list for per-trace values
-				if extra_payload:
-					for k, v in extra_payload.items():
-						restyle_dict[k] = v(col) if callable(v) else v
-
-			if method == "restyle":
-				args = [restyle_dict, [0]] 
-			elif method == "update":
-				relayout = relayout_fn(col) if relayout_fn else {}  # layout updates (axis titles, annotations, etc.)
-				args = [restyle_dict, relayout]
-			elif method == "relayout":
-				relayout = relayout_fn(col) if relayout_fn else {}
-				# args = [relayout]
-				args = [[0], relayout]
-			else:
-				# fallback to restyle behavior
-				args = [restyle_dict, [0]]
-
-			buttons.append({"method": method, "label": col, "args": args})
+			col_arrays = {attr_path: arrays[col], **extra_arrays.get(col, {})}
+			restyle = {attr: share(arr) for attr, arr in col_arrays.items()}
+			restyle.update(extra_payload(col))
+			buttons.append({"method": "skip", "label": col, "args": [restyle, {}, list(col_arrays)]})
 		return buttons
 
+	def update_buttons(attr_path: str, arrays: dict, relayout_fn: Callable[[str], dict]):
+		"""Buttons setting trace attribute `attr_path` (e.g. "x") to each column's array
+		in `arrays` and applying the layout changes returned by relayout_fn(col)."""
+		return [{"method": "skip", "label": col,
+				 "args": [{attr_path: share(arrays[col])}, relayout_fn(col), [attr_path]]}
+				for col in cols]
+
 	positions = {"x": 0.0,
 			  	 "y": 0.2,
 			  	 "color": 0.4,
 			  	 "size": 0.6,
 			  	 "theme": 0.8}
 	
+	# x/y values: non-numeric columns are stringified once and the same arrays serve
+	# both dropdowns (and are therefore embedded once in the shared arrays)
+	xy_values = {c: raw[c] if is_num[c] else df[c].astype(str).to_numpy() for c in cols}
+
 	# X dropdown
-	x_buttons = make_buttons_for_attr(
-		"x",
-		transform=lambda s: s.astype(str).tolist() if not is_numeric_series(s) else s.tolist(),
-		method="update",
-		relayout_fn=lambda col: {'xaxis': {'title': {'text': col}}}
-	)
-	updatemenus.append(dict(active=cols.index(default_x), 
+	x_buttons = update_buttons("x", xy_values, lambda col: {'xaxis': {'title': {'text': col}}})
+	updatemenus.append(dict(active=col_pos[default_x], 
 								buttons=x_buttons, 
 								x=positions["x"], 
 								xanchor="left", 
@@ -164,13 +199,8 @@ def make_scatter_with_dropdowns(df: pd.DataFrame, default_x: str = None, default
 								)
 
 	# Y dropdown
-	y_buttons = make_buttons_for_attr(
-		"y",
-		transform=lambda s: s.astype(str).tolist() if not is_numeric_series(s) else s.tolist(),
-		method="update",
-		relayout_fn=lambda col: {'yaxis': {'title': {'text': col}}}
-	)
-	updatemenus.append(dict(active=cols.index(default_y), 
+	y_buttons = update_buttons("y", xy_values, lambda col: {'yaxis': {'title': {'text': col}}})
+	updatemenus.append(dict(active=col_pos[default_y], 
 						    buttons=y_buttons, 
 							x=positions["y"], 
 							xanchor="left", 
@@ -178,16 +208,50 @@ def make_scatter_with_dropdowns(df: pd.DataFrame, default_x: str = None, default
 							direction="down", 
 							showactive=True))
 
-	# Color dropdown
-	def color_payload(col_name: str):
-		s = df[col_name]
-		if is_numeric_series(s):
-			return {"marker.colorscale": "Viridis", "marker.showscale": True}
+	# Color dropdown. Non-numeric columns are factorized to integer codes on a
+	# discrete scale (the labels go on the colorbar), so they ship as compact typed arrays;
+	# the stringified x/y array doubles as customdata for the hover text. Columns with more than
+	# MAX_COLOR_CATEGORIES values (ids, free text) get one flat color instead
+	color_values = {}
+	color_labels = {}
+	color_arrays = {}
+	constant_color = np.zeros(len(df), dtype=np.int8)  # one shared array for all flat-color columns
+	for c in cols:
+		if is_num[c]:
+			color_values[c] = raw[c]
+		elif exceeds_cardinality(xy_values[c], MAX_COLOR_CATEGORIES):
+			color_values[c] = constant_color
 		else:
-			return {"marker.colorscale": None, "marker.showscale": False}
+			codes, uniques = pd.factorize(df[c], use_na_sentinel=False)
+			color_values[c] = codes.astype(np.int32)
+			color_labels[c] = [str(u) for u in uniques]
+			color_arrays[c] = {"customdata": xy_values[c]}
 
-	color_buttons = make_buttons_for_attr("marker.color", lambda s: s.tolist(), extra_payload={"marker.colorscale": lambda col: ("Viridis" if is_numeric_series(df[col]) else None), "marker.showscale": lambda col: (True if is_numeric_series(df[col]) else False)})
-	default_color_index = cols.index(default_color) if default_color in cols else 0
+	def color_payload(col_name: str):
+		if is_num[col_name]:
+			return {"marker.colorscale": "Viridis", "marker.showscale": True,
+					"marker.cmin": None, "marker.cmax": None,
+					"marker.colorbar.tickvals": None, "marker.colorbar.ticktext": None,
+					"hovertemplate": f"X: %{{x}}<br>Y: %{{y}}<br>{col_name}: %{{marker.color}}<extra></extra>"}
+		elif col_name not in color_labels:
+			return {"marker.colorscale": [discrete_colorscale(1)], "marker.showscale": False,
+					"marker.cmin": None, "marker.cmax": None,
+					"marker.colorbar.tickvals": None, "marker.colorbar.ticktext": None,
+					"hovertemplate": "X: %{x}<br>Y: %{y}<extra></extra>"}
+		else:
+			# array values are wrapped in a list: restyle reads a bare list as one value per trace
+			n = max(len(color_labels[col_name]), 1)
+			return {"marker.colorscale": [discrete_colorscale(n)], "marker.showscale": True,
+					"marker.cmin": -0.5, "marker.cmax": n - 0.5,
+					"marker.colorbar.tickvals": [list(range(n))], "marker.colorbar.ticktext": [color_labels[col_name]],
+					"hovertemplate": f"X: %{{x}}<br>Y: %{{y}}<br>{col_name}: %{{customdata}}<extra></extra>"}
+
+	color_buttons = restyle_buttons("marker.color", color_values, color_payload, color_arrays)
+	# initial color, styled the same way as its dropdown entry
+	initial_color = {"marker.color": color_values[default_color], **color_arrays.get(default_color, {})}
+	fig.plotly_restyle({**{attr: [arr] for attr, arr in initial_color.items()}, **color_payload(default_color)},
+					   trace_indexes=0)
+	default_color_index = col_pos.get(default_color, 0)
 	updatemenus.append(dict(active=default_color_index, 
 						    buttons=color_buttons, 
 							x=positions["color"], 
@@ -198,17 +262,20 @@ def make_scatter_with_dropdowns(df: pd.DataFrame, default_x: str = None, default
 							)
 
 	# Size dropdown: for non-numeric columns use a constant size (10). Otherwise scale to resonable sizes (5-25)
-	def size_transform(s: pd.Series):
-		if not is_numeric_series(s):
-			return [10] * len(s)
-		arr = s.astype(float)
-		rng = arr.max() - arr.min()
-		if rng == 0 or pd.isna(rng):
-			return [10] * len(arr)
-		scaled = 5 + ((arr - arr.min()) / rng) * 20
-		return scaled.tolist()
-
-	size_buttons = make_buttons_for_attr("marker.size", size_transform)
+	constant_size = np.full(len(df), 10)  # one shared array for all constant-size columns
+
+	def size_transform(col: str):
+		if not is_num[col]:
+			return constant_size
+		arr = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+		# fmin/fmax skip NaN like pandas' min/max; the initial values cover empty and all-NaN columns
+		lo = np.fmin.reduce(arr, initial=np.inf)
+		rng = np.fmax.reduce(arr, initial=-np.inf) - lo
+		if rng == 0 or not np.isfinite(rng):
+			return constant_size
+		return 5 + (arr - lo) * (20 / rng)
+
+	size_buttons = restyle_buttons("marker.size", {c: size_transform(c) for c in cols}, lambda col: {})
 	updatemenus.append(dict(active=0, 
 						    buttons=size_buttons, 
 							x=positions["size"], 
@@ -218,16 +285,30 @@ def make_scatter_with_dropdowns(df: pd.DataFrame, default_x: str = None, default
 							showactive=True)
 							)
 	
-	# Theme dropdown (plotly templates)
+	# Theme dropdown (plotly templates). plotly.js cannot look templates up by name,
+	# so each button carries the template itself, trimmed to what a scatter uses:
+	# the layout plus the scatter/scattergl trace defaults
+	# Skip "none" and private names, and list the themes in a stable order
+	theme_names = sorted(t for t in pio.templates if t != "none" and not t.startswith("_"))
 	theme_buttons = []
-	for t in pio.templates:
+	seen_templates = set()
+	for t in theme_names:
+		template = pio.templates[t].to_plotly_json()
+		template["data"] = {k: v for k, v in template.get("data", {}).items() if k in ("scatter", "scattergl")}
+		# aliases registered under a second name would only add an identical button
+		key = json.dumps(template, sort_keys=True)
+		if key in seen_templates:
+			continue
+		seen_templates.add(key)
 		theme_buttons.append({
 			"method": "relayout",
 			"label": t,
-			"args": [{"template": pio.templates[t]}],
+			"args": [{"template": template}],
 		})
+	theme_labels = [b["label"] for b in theme_buttons]
+	default_theme = pio.templates.default
 
-	updatemenus.append(dict(active=0, 
+	updatemenus.append(dict(active=theme_labels.index(default_theme) if default_theme in theme_labels else 0, 
 						    buttons=theme_buttons, 
 							x=positions["theme"], 
 							xanchor="left", 
@@ -250,6 +331,7 @@ def make_scatter_with_dropdowns(df: pd.DataFrame, default_x: str = None, default
 	fig.update_layout(
 		updatemenus=updatemenus,
 		annotations=annotations,
+		meta={"arrays": shared_arrays},
 		margin=dict(t=120),
 		title_text="Interactive scatter — choose columns from dropdowns",
 	)
@@ -260,36 +342,64 @@ def make_scatter_with_dropdowns(df: pd.DataFrame, default_x: str = None, default
 	return fig
 
 
+def save_html(fig: go.Figure, path: Path, config: dict) -> None:
+	"""Render the figure to standalone HTML and write it in a single buffered write.
+
+	A path ending in `.gz` (e.g. `plot.html.gz`) is written gzip-compressed; browsers
+	only open those when a web server serves them with `Content-Encoding: gzip`.
+	"""
+	html = pio.to_html(fig, include_plotlyjs="cdn", post_script=SHARED_ARRAYS_SCRIPT, config=config)
+	if path.suffix == ".gz":
+		with gzip.open(path, "wt", encoding="utf-8", compresslevel=6) as f:
+			f.write(html)
+		return
+	with open(path, "w", encoding="utf-8", buffering=1 << 20) as f:
+		f.write(html)
+
+
 def parse_args(argv=None):
 	p = argparse.ArgumentParser(description="Create an interactive scatter plot from a CSV with dropdowns for axes, color and size.")
 	p.add_argument("-i", "--input", nargs="?", 
 				   help="Path to CSV file. If omitted, a sample dataset is used.")
 	p.add_argument("-o", "--out", 
-				   help="Output HTML file path. If omitted the HTML is opened in the browser.")
+				   help="Output HTML file path (gzip-compressed if it ends in .gz). If omitted the HTML is opened in the browser.")
+	p.add_argument("--all-points", action="store_true",
+				   help=f"Plot every row; by default CSVs over {MAX_POINTS:,} rows are randomly sampled.")
+	p.add_argument("--debug", action="store_true",
+				   help="Without -o, also keep the HTML in a temporary file instead of serving it from memory.")
 	return p.parse_args(argv)
 
 
 def main(argv=None):
 	args = parse_args(argv)
 	df = load_data(args.input)
+	n_rows = len(df)
+	# every column's array is embedded in the HTML, so cap what the browser has to load
+	sampled = n_rows > MAX_POINTS and not args.all_points
+	if sampled:
+		df = df.sample(MAX_POINTS, random_state=0)
+		print(f"Plotting a random sample of {MAX_POINTS:,} of {n_rows:,} rows (use --all-points to plot all)")
 
 	# Build figure
 	fig = make_scatter_with_dropdowns(df)
+	if sampled:
+		fig.update_layout(title_text=f"Interactive scatter — random sample of {MAX_POINTS:,} of {n_rows:,} rows")
 	if args.out:
 		out_path = Path(args.out)
-		fig.write_html(out_path, 
-					   include_plotlyjs="cdn",
-					   config= {'displaylogo': False,
-				 	   			'modeBarButtonsToRemove': ['lasso2d','select2d']
-				 })
+		save_html(fig, out_path, config={'displaylogo': False,
+										 'modeBarButtonsToRemove': ['lasso2d','select2d']})
 		print(f"Saved interactive plot to: {out_path}")
+	elif not args.debug:
+		# plotly's browser renderer serves the HTML from memory on a one-shot local server
+		print("Opening interactive plot in the browser")
+		fig.show(renderer="browser",
+				 post_script=SHARED_ARRAYS_SCRIPT,
+				 config={'displaylogo': False})
 	else:
 		# save to a temporary file and open it. 
 		with tempfile.NamedTemporaryFile(suffix=".html", delete=False) as tmp:
 			tmp_path = Path(tmp.name)
-		fig.write_html(tmp_path, 
-				       include_plotlyjs="cdn",
-					   config= {'displaylogo': False})
+		save_html(fig, tmp_path, config={'displaylogo': False})
 		print(f"Opening interactive plot: {tmp_path}")
 		webbrowser.open(tmp_path.as_uri())
 